@@ -81,9 +81,10 @@ def check_services():
             WHERE id = ?
         """, (status, response_time, datetime.now(timezone.utc), service['id']))
 
-    # The line that was causing the error is now correct because of the new import
-    ninety_days_ago = datetime.now(timezone.utc) - timedelta(days=90)
-    conn.execute('DELETE FROM status_history WHERE timestamp < ?', (ninety_days_ago,))
+    retention_row = conn.execute("SELECT value FROM settings WHERE key = 'history_retention_days'").fetchone()
+    retention_days = int(retention_row['value']) if retention_row else 365
+    retention_cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    conn.execute('DELETE FROM status_history WHERE timestamp < ?', (retention_cutoff,))
 
     conn.commit()
     conn.close()
\ No newline at end of file
@@ -29,6 +29,11 @@ class SettingsForm(FlaskForm):
         validators=[DataRequired(), NumberRange(min=10, max=3600)],
         description=_l("How often to check service status. Min: 10, Max: 3600.")
     )
+    history_retention_days = IntegerField(
+        _l('History Retention (days)'),
+        validators=[DataRequired(), NumberRange(min=7, max=3650)],
+        description=_l("How long status history is kept for the uptime bars and exports. Min: 7, Max: 3650.")
+    )
     submit = SubmitField(_l('save_settings'))
 
 class IncidentForm(FlaskForm):
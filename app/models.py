@@ -43,6 +43,7 @@ def init_db():
     );
 
     CREATE TABLE IF NOT EXISTS status_history (id INTEGER PRIMARY KEY AUTOINCREMENT, service_id INTEGER NOT NULL, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP, status TEXT NOT NULL, response_time INTEGER, FOREIGN KEY (service_id) REFERENCES services (id) ON DELETE CASCADE);
+    CREATE INDEX IF NOT EXISTS idx_status_history_timestamp ON status_history (timestamp);
     """
     cursor.executescript(schema)
     
@@ -57,6 +58,7 @@ def init_db():
     cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('slack_webhook_url', ?)", (os.environ.get('SLACK_WEBHOOK_URL', ''),))
     cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('page_title', 'System Status')")
     cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('check_interval_seconds', '60')")
+    cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('history_retention_days', '365')")
 
     conn.commit()
     conn.close()
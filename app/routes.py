@@ -1,4 +1,8 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
+import csv
+import io
+import json
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, jsonify, session,
+                   Response, stream_with_context)
 from flask_login import login_user, logout_user, login_required, current_user
 from datetime import datetime, timedelta, timezone
 from collections import defaultdict
@@ -10,6 +14,10 @@ from .core import check_services
 
 main = Blueprint('main', __name__)
 
+EXPORT_CHUNK_SIZE = 500
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
 def parse_db_times(rows, time_keys=['created_at', 'start_time', 'end_time', 'last_checked', 'timestamp']):
     """Converts timestamp strings from DB into timezone-aware datetime objects."""
     parsed_rows = []
@@ -189,6 +197,141 @@ def api_admin_delete_service(service_id):
     conn.close()
     return jsonify({'message': 'Service deleted successfully'}), 200
 
+def parse_export_args(allow_service_filter=True):
+    """Reads format, date range and service filter from the query string of an export request."""
+    errors = {}
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        errors['format'] = [f"Must be one of: {', '.join(EXPORT_FORMATS)}."]
+
+    try:
+        end_raw = request.args.get('end')
+        end_date = datetime.strptime(end_raw, '%Y-%m-%d') if end_raw else datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        start_raw = request.args.get('start')
+        start_date = datetime.strptime(start_raw, '%Y-%m-%d') if start_raw else end_date - timedelta(days=60)
+        # The end date is inclusive, so the range runs up to the start of the following day.
+        range_end = end_date + timedelta(days=1)
+    except ValueError:
+        errors['date'] = ['Dates must use the YYYY-MM-DD format.']
+        start_date = end_date = None
+    except OverflowError:
+        errors['date'] = ['Dates are out of the supported range.']
+        start_date = end_date = None
+    if start_date and end_date and start_date > end_date:
+        errors['date'] = ['Start date must not be after end date.']
+
+    service_ids_raw = request.args.getlist('service_id')
+    service_ids = []
+    if service_ids_raw and not allow_service_filter:
+        errors['service_id'] = ['This export cannot be filtered by service.']
+    elif service_ids_raw:
+        try:
+            service_ids = [int(value) for value in service_ids_raw]
+        except ValueError:
+            errors['service_id'] = ['Service IDs must be integers.']
+
+    if errors:
+        return None, errors
+    return {
+        'format': export_format,
+        'start': start_date.strftime('%Y-%m-%d %H:%M:%S'),
+        'end': range_end.strftime('%Y-%m-%d %H:%M:%S'),
+        'service_ids': service_ids,
+    }, None
+
+def escape_csv_formula(value):
+    """Prefixes text cells that a spreadsheet would run as a formula with a quote."""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def stream_export(query, params, order_by, columns, export_format):
+    """
+    Yields the query result as CSV or NDJSON, EXPORT_CHUNK_SIZE rows at a time.
+    Each chunk is a separate keyset query on the (time, id) columns in order_by, so no
+    read lock is held between yields and the status checker can keep writing.
+    """
+    time_col, id_col = order_by
+    time_key, id_key = time_col.split('.')[-1], id_col.split('.')[-1]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == 'csv':
+        writer.writerow(columns)
+        yield buffer.getvalue()
+    last_key = None
+    while True:
+        chunk_query, chunk_params = query, list(params)
+        if last_key:
+            chunk_query += f" AND ({time_col}, {id_col}) > (?, ?)"
+            chunk_params.extend(last_key)
+        chunk_query += f" ORDER BY {time_col}, {id_col} LIMIT ?"
+        chunk_params.append(EXPORT_CHUNK_SIZE)
+        conn = get_db_connection()
+        rows = conn.execute(chunk_query, chunk_params).fetchall()
+        conn.close()
+        if not rows:
+            break
+        last_key = (rows[-1][time_key], rows[-1][id_key])
+        buffer.seek(0)
+        buffer.truncate()
+        for row in parse_db_times(rows):
+            values = [row[c].isoformat() if isinstance(row[c], datetime) else row[c] for c in columns]
+            if export_format == 'csv':
+                writer.writerow([escape_csv_formula(v) for v in values])
+            else:
+                buffer.write(json.dumps(dict(zip(columns, values))) + '\n')
+        yield buffer.getvalue()
+        if len(rows) < EXPORT_CHUNK_SIZE:
+            break
+
+def export_response(name, query, params, order_by, columns, export_format):
+    filename = f"{name}.{export_format}"
+    return Response(stream_with_context(stream_export(query, params, order_by, columns, export_format)),
+                    mimetype=EXPORT_FORMATS[export_format],
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@main.route('/api/admin/export/status_history', methods=['GET'])
+@login_required
+def api_admin_export_status_history():
+    args, errors = parse_export_args()
+    if errors:
+        return jsonify({'errors': errors}), 400
+    query = """
+        SELECT h.id, h.service_id, s.name AS service_name, h.timestamp, h.status, h.response_time
+        FROM status_history h LEFT JOIN services s ON s.id = h.service_id
+        WHERE h.timestamp >= ? AND h.timestamp < ?
+    """
+    params = [args['start'], args['end']]
+    if args['service_ids']:
+        query += f" AND h.service_id IN ({', '.join('?' for _ in args['service_ids'])})"
+        params.extend(args['service_ids'])
+    columns = ['id', 'service_id', 'service_name', 'timestamp', 'status', 'response_time']
+    return export_response('status_history', query, params, ('h.timestamp', 'h.id'), columns, args['format'])
+
+@main.route('/api/admin/export/incidents', methods=['GET'])
+@login_required
+def api_admin_export_incidents():
+    args, errors = parse_export_args(allow_service_filter=False)
+    if errors:
+        return jsonify({'errors': errors}), 400
+    query = "SELECT id, title, status, severity, created_at FROM incidents WHERE created_at >= ? AND created_at < ?"
+    columns = ['id', 'title', 'status', 'severity', 'created_at']
+    return export_response('incidents', query, (args['start'], args['end']), ('created_at', 'id'), columns, args['format'])
+
+@main.route('/api/admin/export/incident_updates', methods=['GET'])
+@login_required
+def api_admin_export_incident_updates():
+    args, errors = parse_export_args(allow_service_filter=False)
+    if errors:
+        return jsonify({'errors': errors}), 400
+    query = """
+        SELECT u.id, u.incident_id, i.title AS incident_title, u.status, u.update_text, u.created_at
+        FROM incident_updates u LEFT JOIN incidents i ON i.id = u.incident_id
+        WHERE u.created_at >= ? AND u.created_at < ?
+    """
+    columns = ['id', 'incident_id', 'incident_title', 'status', 'update_text', 'created_at']
+    return export_response('incident_updates', query, (args['start'], args['end']), ('u.created_at', 'u.id'), columns, args['format'])
+
 @main.route('/admin/services')
 @login_required
 def admin_services():
@@ -292,6 +435,7 @@ def admin_settings():
         conn.execute("UPDATE settings SET value = ? WHERE key = 'page_title'", (form.page_title.data,))
         conn.execute("UPDATE settings SET value = ? WHERE key = 'slack_webhook_url'", (form.slack_webhook_url.data,))
         conn.execute("UPDATE settings SET value = ? WHERE key = 'check_interval_seconds'", (str(form.check_interval_seconds.data),))
+        conn.execute("UPDATE settings SET value = ? WHERE key = 'history_retention_days'", (str(form.history_retention_days.data),))
         conn.commit()
         flash(_('settings_saved_success'), 'success')
         return redirect(url_for('main.admin_settings'))